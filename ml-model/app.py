@@ -5,16 +5,17 @@ Exposes prediction endpoints for backend integration
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from predictor import AuraPredictor
+from predictor import AuraPredictor, RECOMMENDATION_TEMPLATES
 from data_integrator import DataIntegrator
-import numpy as np
+from response_encoding import encode_response
 from datetime import datetime
+import logging
 
 app = Flask(__name__)
 CORS(app)
 
 # Initialize predictor and data integrator
-predictor = AuraPredictor()
+predictor = AuraPredictor.from_env()
 integrator = DataIntegrator()
 
 @app.route('/health', methods=['GET'])
@@ -39,6 +40,10 @@ def predict_risk():
         "storage_quality": 0.7,
         "moisture_content": 12.5
     }
+    
+    Optional query parameters:
+        ?fields=prediction,recommendations.priority  - return selected fields only
+        ?recommendations=id  - return recommendation template_id instead of action text
     """
     try:
         data = request.json
@@ -46,9 +51,6 @@ def predict_risk():
         # Extract parameters
         latitude = data.get('latitude')
         longitude = data.get('longitude')
-        storage_type = data.get('storage_type', 'bag')
-        ventilation = data.get('storage_quality', 0.5)
-        moisture = data.get('moisture_content', 12.0)
         
         if not latitude or not longitude:
             return jsonify({'error': 'Latitude and longitude required'}), 400
@@ -58,29 +60,14 @@ def predict_risk():
         weather_data = integrator.fetch_weather_data(latitude, longitude)
         
         # Prepare storage data
-        storage_data = {
-            'type': storage_type,
-            'ventilation_score': ventilation,
-            'moisture_content': moisture
-        }
-        
-        # Build time series (use current + forecast data)
-        sequence = []
-        for i in range(48):  # 48 hours
-            features = predictor.preprocess_data(
-                satellite_data,
-                weather_data['current'],
-                storage_data
-            )
-            sequence.append(features)
-        
-        sequence = np.array(sequence)
-        
-        # Get prediction
-        risk_result = predictor.predict_risk(sequence)
+        storage_data = AuraPredictor.storage_data_from(data)
         
-        # Get recommendations
-        recommendations = predictor.generate_recommendations(risk_result)
+        # Get prediction and recommendations (current conditions over 48 hours)
+        risk_result, recommendations = predictor.assess(
+            satellite_data,
+            weather_data['current'],
+            storage_data
+        )
         
         # Calculate risk factors
         risk_factors = integrator.calculate_risk_factors(satellite_data, weather_data)
@@ -93,12 +80,13 @@ def predict_risk():
             'data_sources': {
                 'satellite': satellite_data,
                 'weather': weather_data['current'],
+                'weather_source': weather_data['source'],
                 'storage': storage_data
             },
             'forecast': weather_data['forecast'][:24]  # Next 24 hours
         }
         
-        return jsonify(response)
+        return encode_response(request, response)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -119,7 +107,7 @@ def get_forecast():
         
         weather_data = integrator.fetch_weather_data(latitude, longitude, hours)
         
-        return jsonify(weather_data)
+        return encode_response(request, weather_data)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -140,17 +128,34 @@ def get_satellite():
         
         satellite_data = integrator.fetch_satellite_data(latitude, longitude, date)
         
-        return jsonify(satellite_data)
+        return encode_response(request, satellite_data)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/recommendations/templates', methods=['GET'])
+def get_recommendation_templates():
+    """
+    Recommendation action lists keyed by template id
+    Lets clients resolve ?recommendations=id responses locally
+    """
+    templates = {
+        template_id: list(actions)
+        for template_id, actions in RECOMMENDATION_TEMPLATES.items()
+    }
+    response = encode_response(request, templates)
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response
+
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
     print("Starting AURA ML API Server...")
     print("Endpoints available:")
     print("  POST /api/predict - Get aflatoxin risk prediction")
     print("  POST /api/forecast - Get weather forecast")
     print("  POST /api/satellite - Get satellite analysis")
+    print("  GET /api/recommendations/templates - Recommendation templates by id")
     print("  GET /health - Health check")
     
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,294 @@
+"""
+Offline Bulk Scoring CLI
+Scores large farm files (CSV/Parquet) in chunks across a process pool
+and streams results to a CSV file with resumable checkpoints
+"""
+
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from predictor import AuraPredictor, DEFAULT_STORAGE
+from data_integrator import DataIntegrator
+
+OUTPUT_FIELDS = [
+    'farm_id',
+    'latitude',
+    'longitude',
+    'risk_score',
+    'risk_level',
+    'priority',
+    'recommendations_id',
+    'error'
+]
+
+# Per-process model and data clients, created once by the pool initializer
+_predictor = None
+_integrator = None
+
+
+def _init_worker(verbose=False):
+    """Create one predictor and data integrator per worker process"""
+    global _predictor, _integrator
+
+    # Fetch failures (warnings) always show; per-farm fetch logs only with --verbose
+    logging.basicConfig(level=logging.INFO if verbose else logging.WARNING,
+                        format='%(levelname)s %(name)s: %(message)s')
+
+    _predictor = AuraPredictor.from_env()
+    _integrator = DataIntegrator()
+
+
+def _value(farm, key, default=None):
+    """Read a column value, treating blanks and NaN as missing"""
+    value = farm.get(key, default)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return default
+    return value
+
+
+def score_farms(predictor, integrator, farms):
+    """
+    Score a chunk of farm records with the same pipeline as /api/predict
+
+    Upstream data is fetched per farm, then all sequences in the chunk are
+    scored with a single model call.
+
+    Args:
+        farms: Mappings with latitude, longitude, storage_type,
+               storage_quality and moisture_content (optional farm_id)
+
+    Returns:
+        Flat result rows matching OUTPUT_FIELDS, in input order
+    """
+    rows = []
+    pending = []  # (row, (satellite, weather_current, storage)) awaiting scoring
+
+    for farm in farms:
+        latitude = _value(farm, 'latitude')
+        longitude = _value(farm, 'longitude')
+
+        row = {
+            'farm_id': _value(farm, 'farm_id', ''),
+            'latitude': latitude,
+            'longitude': longitude
+        }
+        rows.append(row)
+
+        if not latitude or not longitude:
+            row['error'] = 'Latitude and longitude required'
+            continue
+
+        try:
+            satellite_data = integrator.fetch_satellite_data(latitude, longitude)
+            weather_data = integrator.fetch_weather_data(latitude, longitude)
+            storage_data = AuraPredictor.storage_data_from(
+                {key: _value(farm, key) for key in DEFAULT_STORAGE}
+            )
+        except Exception as e:
+            row['error'] = str(e)
+            continue
+
+        pending.append((row, (satellite_data, weather_data['current'], storage_data)))
+
+    if pending:
+        try:
+            results = predictor.assess_batch([inputs for _, inputs in pending])
+        except Exception as e:
+            for row, _ in pending:
+                row['error'] = str(e)
+            return rows
+
+        for (row, _), (risk_result, recommendations) in zip(pending, results):
+            row.update({
+                'risk_score': round(risk_result['risk_score'], 2),
+                'risk_level': risk_result['risk_level'],
+                'priority': recommendations['priority'],
+                'recommendations_id': recommendations['template_id']
+            })
+
+    return rows
+
+
+def _score_chunk(index, farms):
+    """Worker entry point: score one chunk of farm records"""
+    return index, score_farms(_predictor, _integrator, farms)
+
+
+def iter_chunks(path, chunk_size):
+    """
+    Stream farm records from a CSV or Parquet file
+
+    Yields:
+        Lists of up to chunk_size farm dicts
+    """
+    if path.lower().endswith(('.parquet', '.pq')):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet files requires pyarrow (pip install pyarrow)")
+
+        parquet_file = pq.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas().to_dict('records')
+    else:
+        for frame in pd.read_csv(path, chunksize=chunk_size):
+            yield frame.to_dict('records')
+
+
+def input_fingerprint(path):
+    """Identify the input file version so stale checkpoints are detected"""
+    stat = os.stat(path)
+    return {
+        'input': os.path.abspath(path),
+        'input_size': stat.st_size,
+        'input_mtime': stat.st_mtime
+    }
+
+
+def load_checkpoint(checkpoint_path, input_path, chunk_size):
+    """Load resume state, refusing checkpoints from a different run or input version"""
+    if not os.path.exists(checkpoint_path):
+        return None
+
+    with open(checkpoint_path) as f:
+        state = json.load(f)
+
+    fingerprint = input_fingerprint(input_path)
+    if state.get('chunk_size') != chunk_size or any(
+            state.get(key) != value for key, value in fingerprint.items()):
+        raise SystemExit(
+            f"Checkpoint {checkpoint_path} belongs to a different input, input version "
+            "or chunk size; use --restart to discard it"
+        )
+    return state
+
+
+def save_checkpoint(checkpoint_path, state):
+    """Atomically persist resume state"""
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def run(args):
+    checkpoint_path = args.checkpoint or args.output + '.checkpoint.json'
+
+    state = None
+    if args.restart:
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+    else:
+        state = load_checkpoint(checkpoint_path, args.input, args.chunk_size)
+
+    if state is None:
+        state = dict(input_fingerprint(args.input))
+        state.update({
+            'chunk_size': args.chunk_size,
+            'chunks_done': 0,
+            'rows_written': 0,
+            'output_bytes': 0
+        })
+    else:
+        # The output must still hold everything the checkpoint says was written
+        output_size = os.path.getsize(args.output) if os.path.exists(args.output) else 0
+        if output_size < state['output_bytes']:
+            raise SystemExit(
+                f"Output {args.output} is shorter than checkpoint {checkpoint_path} records "
+                f"({output_size} < {state['output_bytes']} bytes); use --restart to start over"
+            )
+        print(f"Resuming after chunk {state['chunks_done']} ({state['rows_written']} farms already scored)")
+
+    # Drop any rows written after the last checkpoint
+    out = open(args.output, 'a+', newline='', encoding='utf-8')
+    out.truncate(state['output_bytes'])
+    out.seek(state['output_bytes'])
+    writer = csv.DictWriter(out, fieldnames=OUTPUT_FIELDS)
+    if state['output_bytes'] == 0:
+        writer.writeheader()
+
+    workers = args.workers or os.cpu_count() or 1
+    max_pending = args.max_pending or workers * 2
+    skip = state['chunks_done']
+    started = time.time()
+    scored = 0
+
+    pending = {}
+    next_index = skip
+
+    def write_result(future):
+        nonlocal scored
+        index, rows = future.result()
+        writer.writerows(rows)
+        out.flush()
+        # Rows must be on disk before the checkpoint claims them
+        os.fsync(out.fileno())
+
+        state['chunks_done'] = index + 1
+        state['rows_written'] += len(rows)
+        state['output_bytes'] = out.tell()
+        save_checkpoint(checkpoint_path, state)
+
+        scored += len(rows)
+        rate = scored / max(time.time() - started, 1e-9)
+        print(f"Chunk {index + 1}: {state['rows_written']} farms scored ({rate:.1f} farms/s)")
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(args.verbose,)) as pool:
+            for index, farms in enumerate(iter_chunks(args.input, args.chunk_size)):
+                if index < skip:
+                    continue
+                pending[index] = pool.submit(_score_chunk, index, farms)
+
+                # Bound memory: write completed chunks in order before reading more
+                while len(pending) >= max_pending:
+                    write_result(pending.pop(next_index))
+                    next_index += 1
+
+            while pending:
+                write_result(pending.pop(next_index))
+                next_index += 1
+    finally:
+        out.close()
+
+    # All chunks written; a later run over an updated file must start fresh
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    elapsed = time.time() - started
+    print(f"\nDone: {state['rows_written']} farms written to {args.output} in {elapsed:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bulk-score farms for aflatoxin risk from a CSV or Parquet file"
+    )
+    parser.add_argument('input', help="Farm file (.csv or .parquet) with latitude, longitude, "
+                                      "storage_type, storage_quality, moisture_content columns")
+    parser.add_argument('output', help="Output CSV file")
+    parser.add_argument('--chunk-size', type=int, default=500,
+                        help="Farms per chunk (default: 500)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument('--max-pending', type=int, default=None,
+                        help="Chunks in flight at once (default: 2 x workers)")
+    parser.add_argument('--checkpoint', default=None,
+                        help="Checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore any existing checkpoint and start over")
+    parser.add_argument('--verbose', action='store_true',
+                        help="Show per-farm data fetch logs from workers (failures always show)")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
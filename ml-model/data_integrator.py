@@ -6,16 +6,24 @@ Fetches data from Sentinel-2 satellite API and weather services
 import requests
 from datetime import datetime, timedelta
 import os
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class DataIntegrator:
     """Handles all external data source integrations"""
     
     def __init__(self):
         self.sentinel_api_key = os.getenv('SENTINEL_API_KEY', '')
         self.weather_api_key = os.getenv('WEATHER_API_KEY', '')
+        # Test-only hook: load_test.py points this at stub_upstreams' /stats route.
+        # It is not a Sentinel Hub API and must not be set in deployments.
+        self.sentinel_stub_url = os.getenv('AURA_TEST_SENTINEL_STUB_URL', '').rstrip('/')
+        # Overridable so load tests can point at a local OpenWeatherMap stub
+        self.weather_api_url = os.getenv('WEATHER_API_URL', 'https://api.openweathermap.org/data/2.5').rstrip('/')
         
     def fetch_satellite_data(self, latitude, longitude, date=None):
         """
@@ -31,11 +39,33 @@ class DataIntegrator:
                 # Using OpenAgro API as a proxy for this example since it accepts simple keys
                 # In production, use official Sentinel Hub OAuth flow
                 
-                print(f"Fetching REAL satellite data for ({latitude}, {longitude})...")
+                logger.info(f"Fetching REAL satellite data for ({latitude}, {longitude})...")
                 
                 # Setup specific for the provided key (Assuming simple API for this contest/demo)
                 # If this fails, it falls back gracefully
                 
+                if self.sentinel_stub_url:
+                    # Load-testing stub only (see __init__)
+                    res = requests.get(
+                        f"{self.sentinel_stub_url}/stats",
+                        params={'lat': latitude, 'lon': longitude, 'date': date},
+                        headers={'Authorization': f"Bearer {self.sentinel_api_key}"},
+                        timeout=5
+                    )
+                    res.raise_for_status()
+                    indices = res.json()
+                    return {
+                        'ndvi': indices['ndvi'],
+                        'ndmi': indices['ndmi'],
+                        'crop_health': indices.get('crop_health', 0.7),
+                        'stress_level': indices.get('stress_level', 0.3),
+                        'canopy_water': indices.get('canopy_water', 0.6),
+                        'chlorophyll': indices.get('chlorophyll', 0.68),
+                        'temperature_surface': indices.get('temperature_surface', 28.5),
+                        'is_real_data': True,
+                        'timestamp': date
+                    }
+                
                 # Mock real call latency
                 import time
                 time.sleep(0.5)
@@ -55,10 +85,10 @@ class DataIntegrator:
                 }
                 
             except Exception as e:
-                print(f"Satellite API Error: {e}. Falling back to synthetic.")
+                logger.warning(f"Satellite API Error: {e}. Falling back to synthetic.")
 
         # Synthetic data fallback
-        print(f"Using synthetic satellite data for ({latitude}, {longitude})")
+        logger.info(f"Using synthetic satellite data for ({latitude}, {longitude})")
         return {
             'ndvi': 0.65,
             'ndmi': 0.55,
@@ -77,16 +107,16 @@ class DataIntegrator:
         # Try real API if key exists
         if self.weather_api_key and len(self.weather_api_key) > 5:
             try:
-                print(f"Fetching REAL weather for ({latitude}, {longitude}) from OpenWeatherMap...")
+                logger.info(f"Fetching REAL weather for ({latitude}, {longitude}) from OpenWeatherMap...")
                 
                 # Current Weather
-                url_current = f"https://api.openweathermap.org/data/2.5/weather?lat={latitude}&lon={longitude}&appid={self.weather_api_key}&units=metric"
+                url_current = f"{self.weather_api_url}/weather?lat={latitude}&lon={longitude}&appid={self.weather_api_key}&units=metric"
                 res_current = requests.get(url_current, timeout=5)
                 res_current.raise_for_status()
                 data_current = res_current.json()
                 
                 # Forecast
-                url_forecast = f"https://api.openweathermap.org/data/2.5/forecast?lat={latitude}&lon={longitude}&appid={self.weather_api_key}&units=metric"
+                url_forecast = f"{self.weather_api_url}/forecast?lat={latitude}&lon={longitude}&appid={self.weather_api_key}&units=metric"
                 res_forecast = requests.get(url_forecast, timeout=5)
                 res_forecast.raise_for_status()
                 data_forecast = res_forecast.json()
@@ -121,10 +151,10 @@ class DataIntegrator:
                 }
                 
             except Exception as e:
-                print(f"Weather API Error: {e}. Falling back to synthetic.")
+                logger.warning(f"Weather API Error: {e}. Falling back to synthetic.")
         
         # Synthetic data fallback
-        print(f"Using synthetic weather forecast for ({latitude}, {longitude})")
+        logger.info(f"Using synthetic weather forecast for ({latitude}, {longitude})")
         
         current_weather = {
             'temperature': 31.0,
@@ -194,6 +224,7 @@ class DataIntegrator:
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(name)s: %(message)s')
     integrator = DataIntegrator()
     
     # Example coordinates (Karnataka, India)
@@ -0,0 +1,606 @@
+"""
+Load and Soak Testing Harness
+Replays a /api/predict, /api/forecast and /api/satellite traffic mix against
+the ML service, with local upstream stubs, and tracks latency, errors,
+fallback rates and memory growth over time
+
+The service and the stubs each run in their own spawned process, so client
+threads do not compete with them for the GIL and memory readings cover the
+service alone.
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import signal
+import threading
+import time
+import tracemalloc
+
+import requests
+
+from stub_upstreams import StubProfile, weather_stub, sentinel_stub
+
+DEFAULT_MIX = 'predict=6,forecast=2,satellite=2'
+
+STORAGE_TYPES = ['silo', 'bag', 'warehouse', 'open']
+
+# Farm coordinates are sampled from this box (Karnataka, India)
+LAT_RANGE = (12.0, 18.0)
+LON_RANGE = (74.0, 78.0)
+
+
+def _request_body(endpoint):
+    body = {
+        'latitude': round(random.uniform(*LAT_RANGE), 4),
+        'longitude': round(random.uniform(*LON_RANGE), 4)
+    }
+    if endpoint == 'predict':
+        body.update({
+            'storage_type': random.choice(STORAGE_TYPES),
+            'storage_quality': round(random.uniform(0.2, 0.9), 2),
+            'moisture_content': round(random.uniform(9.0, 16.0), 1)
+        })
+    elif endpoint == 'forecast':
+        body['hours'] = random.choice([24, 48, 72])
+    return body
+
+
+def _is_fallback(endpoint, data):
+    """
+    Detect responses served from synthetic data instead of an upstream
+
+    A prediction counts as a fallback when either its satellite or its
+    weather input was synthetic.
+    """
+    if endpoint == 'predict':
+        sources = data['data_sources']
+        return (not sources['satellite'].get('is_real_data')
+                or sources.get('weather_source') == 'Synthetic')
+    if endpoint == 'forecast':
+        return data.get('source') == 'Synthetic'
+    return not data.get('is_real_data')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class LatencyReservoir:
+    """Fixed-size uniform sample of latencies, so soaks use bounded memory"""
+
+    def __init__(self, size=20000):
+        self.size = size
+        self.samples = []
+        self.seen = 0
+
+    def add(self, value):
+        self.seen += 1
+        if len(self.samples) < self.size:
+            self.samples.append(value)
+        else:
+            slot = random.randrange(self.seen)
+            if slot < self.size:
+                self.samples[slot] = value
+
+    def summary(self):
+        values = sorted(self.samples)
+        return {
+            'p50_ms': percentile(values, 50),
+            'p95_ms': percentile(values, 95),
+            'p99_ms': percentile(values, 99),
+            'max_ms': values[-1] if values else None
+        }
+
+
+class EndpointStats:
+    """Counters for one endpoint over a whole stage"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.fallbacks = 0
+        self.latencies = LatencyReservoir()
+
+    def summary(self, elapsed):
+        summary = {
+            'requests': self.requests,
+            'throughput_rps': self.requests / elapsed if elapsed else 0.0,
+            'error_rate': self.errors / self.requests if self.requests else 0.0,
+            'fallback_rate': self.fallbacks / self.requests if self.requests else 0.0
+        }
+        summary.update(self.latencies.summary())
+        return summary
+
+
+class StageStats:
+    """Thread-safe request recorder for one concurrency stage"""
+
+    def __init__(self, endpoints):
+        self.lock = threading.Lock()
+        self.names = list(endpoints)
+        self.reset()
+
+    def reset(self):
+        """Discard everything recorded so far (e.g. warmup traffic)"""
+        with self.lock:
+            self.endpoints = {name: EndpointStats() for name in self.names}
+            self.interval_latencies = []
+            self.interval_errors = 0
+            self.interval_fallbacks = 0
+
+    def record(self, endpoint, latency_ms, ok, fallback):
+        with self.lock:
+            stats = self.endpoints[endpoint]
+            stats.requests += 1
+            stats.latencies.add(latency_ms)
+            self.interval_latencies.append(latency_ms)
+            if not ok:
+                stats.errors += 1
+                self.interval_errors += 1
+            elif fallback:
+                stats.fallbacks += 1
+                self.interval_fallbacks += 1
+
+    def drain_interval(self):
+        """Return and reset the samples collected since the last call"""
+        with self.lock:
+            latencies = self.interval_latencies
+            errors, fallbacks = self.interval_errors, self.interval_fallbacks
+            self.interval_latencies = []
+            self.interval_errors = 0
+            self.interval_fallbacks = 0
+        return sorted(latencies), errors, fallbacks
+
+
+class MemorySampler:
+    """
+    RSS and tracemalloc readings for the service process
+
+    Args:
+        pid: Service PID for RSS; None records no RSS rather than the harness's
+        service: ChildProcess running the service, for tracemalloc readings
+    """
+
+    def __init__(self, pid=None, service=None):
+        self.pid = pid
+        self.service = service
+        self.baseline = None
+
+    def rss_mb(self):
+        if self.pid is None:
+            return None
+        try:
+            import psutil
+            return psutil.Process(self.pid).memory_info().rss / 1e6
+        except ImportError:
+            pass
+        except Exception:
+            return None
+        try:
+            with open(f"/proc/{self.pid}/statm") as f:
+                pages = int(f.read().split()[1])
+            return pages * os.sysconf('SC_PAGE_SIZE') / 1e6
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def traced_mb(self):
+        if self.service is None:
+            return None
+        return self.service.call('traced_mb')
+
+    def sample(self):
+        return {'rss_mb': self.rss_mb(), 'traced_mb': self.traced_mb()}
+
+    def mark_baseline(self):
+        """Remember current memory (after warmup) to measure growth from"""
+        self.baseline = self.sample()
+        if self.service is not None:
+            self.service.call('baseline')
+
+    def growth(self, top=10):
+        current = self.sample()
+        growth = {'baseline': self.baseline, 'final': current}
+        for key in ('rss_mb', 'traced_mb'):
+            if self.baseline and self.baseline[key] is not None and current[key] is not None:
+                growth[key.replace('_mb', '_growth_mb')] = current[key] - self.baseline[key]
+
+        if self.service is not None:
+            allocations = self.service.call('top_allocations', top)
+            if allocations is not None:
+                growth['top_allocations'] = allocations
+        return growth
+
+
+class ChildProcess:
+    """
+    Spawned helper process driven by (command, arg) messages over a pipe
+
+    The target receives the child end of the pipe, sends one ready message
+    (returned by start) and then answers commands until 'stop'. If the child
+    dies (crash, OOM kill), calls return None and exited_at records when the
+    harness noticed.
+    """
+
+    def __init__(self, target, *args):
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=target, args=(child_conn,) + args, daemon=True)
+        self.lock = threading.Lock()
+        self.exited_at = None
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+    def start(self, timeout=120.0):
+        self.process.start()
+        if not self.conn.poll(timeout):
+            self.process.terminate()
+            raise SystemExit(f"{self.process.name} did not start within {timeout:.0f}s")
+        return self.conn.recv()
+
+    def running(self):
+        """Whether the child is still alive, noting the time it was first seen dead"""
+        if self.exited_at is None and not self.process.is_alive():
+            self.exited_at = time.time()
+        return self.exited_at is None
+
+    def call(self, command, arg=None):
+        if not self.running():
+            return None
+        with self.lock:
+            try:
+                self.conn.send((command, arg))
+                return self.conn.recv()
+            except (EOFError, OSError):
+                self.exited_at = time.time()
+                return None
+
+    def stop(self):
+        """Stop the child; returns its final reply, or {} if it already died"""
+        result = self.call('stop') if self.running() else None
+        self.process.join(10)
+        if self.exited_at is not None and result is None:
+            return {}
+        return result
+
+
+def _serve_app(conn, verbose):
+    """Child process: run app.py's Flask app on a threaded server"""
+    # Ctrl+C reaches the whole process group; the parent decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    level = logging.INFO if verbose else logging.WARNING
+    logging.basicConfig(level=level, format='%(levelname)s %(name)s: %(message)s')
+    logging.getLogger('werkzeug').setLevel(level if verbose else logging.ERROR)
+
+    from werkzeug.serving import make_server
+    import app as ml_app
+
+    server = make_server('127.0.0.1', 0, ml_app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn.send(f"http://127.0.0.1:{server.server_port}")
+
+    baseline = None
+    while True:
+        command, arg = conn.recv()
+        if command == 'traced_mb':
+            conn.send(tracemalloc.get_traced_memory()[0] / 1e6 if tracemalloc.is_tracing() else None)
+        elif command == 'baseline':
+            baseline = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+            conn.send(None)
+        elif command == 'top_allocations':
+            if baseline is None:
+                conn.send(None)
+                continue
+            diff = tracemalloc.take_snapshot().compare_to(baseline, 'lineno')
+            conn.send([
+                {'location': str(stat.traceback), 'size_diff_kb': stat.size_diff / 1024,
+                 'count_diff': stat.count_diff}
+                for stat in diff[:arg]
+            ])
+        elif command == 'stop':
+            server.shutdown()
+            conn.send(None)
+            return
+
+
+def _serve_stubs(conn, latency_ms, jitter_ms, error_rate, timeout_rate):
+    """Child process: run the weather and satellite stubs"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    def profile():
+        return StubProfile(latency_ms, jitter_ms, error_rate, timeout_rate)
+
+    stubs = {'weather': weather_stub(profile()).start(), 'sentinel': sentinel_stub(profile()).start()}
+    conn.send({name: stub.url for name, stub in stubs.items()})
+
+    while True:
+        command, _ = conn.recv()
+        if command == 'stop':
+            stats = {name: stub.profile.stats() for name, stub in stubs.items()}
+            for stub in stubs.values():
+                stub.stop()
+            conn.send(stats)
+            return
+        conn.send(None)
+
+
+def parse_mix(mix):
+    """Parse 'predict=6,forecast=2' into endpoint weights"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ('predict', 'forecast', 'satellite'):
+            raise SystemExit(f"Unknown endpoint in --mix: {name}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def _worker(base_url, weights, stats, stop, timeout):
+    session = requests.Session()
+    endpoints = list(weights)
+    endpoint_weights = list(weights.values())
+
+    while not stop.is_set():
+        endpoint = random.choices(endpoints, weights=endpoint_weights)[0]
+        started = time.perf_counter()
+        ok = False
+        fallback = False
+        try:
+            res = session.post(f"{base_url}/api/{endpoint}", json=_request_body(endpoint),
+                               timeout=timeout)
+            ok = res.status_code == 200
+            if ok:
+                fallback = _is_fallback(endpoint, res.json())
+        except (requests.RequestException, ValueError, KeyError):
+            ok = False
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        stats.record(endpoint, latency_ms, ok, fallback)
+
+
+def run_stage(base_url, concurrency, duration, interval, weights, memory, timeout, log,
+              warmup=0.0):
+    """Drive one concurrency level for duration seconds, reporting every interval"""
+    stats = StageStats(weights)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(target=_worker, args=(base_url, weights, stats, stop, timeout), daemon=True)
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+
+    intervals = []
+    started = time.time()
+    ended = 'completed'
+    try:
+        if warmup:
+            time.sleep(warmup)
+            stats.reset()
+            memory.mark_baseline()
+
+        log(f"\n=== Stage: {concurrency} concurrent clients for {duration:.0f}s ===")
+        log(f"{'elapsed':>8} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err%':>6} {'fb%':>6} "
+            f"{'rss MB':>8} {'heap MB':>8}")
+
+        started = time.time()
+        last = started
+        while True:
+            remaining = started + duration - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+
+            now = time.time()
+            latencies, errors, fallbacks = stats.drain_interval()
+            count = len(latencies)
+            point = {
+                'elapsed_s': round(now - started, 1),
+                'rps': count / (now - last),
+                'p50_ms': percentile(latencies, 50),
+                'p95_ms': percentile(latencies, 95),
+                'p99_ms': percentile(latencies, 99),
+                'error_rate': errors / count if count else 0.0,
+                'fallback_rate': fallbacks / count if count else 0.0
+            }
+            point.update(memory.sample())
+            intervals.append(point)
+            last = now
+
+            log(f"{point['elapsed_s']:>8.0f} {point['rps']:>8.1f} {_fmt(point['p50_ms'])} "
+                f"{_fmt(point['p95_ms'])} {_fmt(point['p99_ms'])} {point['error_rate'] * 100:>6.1f} "
+                f"{point['fallback_rate'] * 100:>6.1f} {_fmt(point['rss_mb'])} {_fmt(point['traced_mb'])}")
+
+            if memory.service is not None and not memory.service.running():
+                log(f"Service process exited (code {memory.service.process.exitcode}); ending stage")
+                ended = 'service_exited'
+                break
+    except KeyboardInterrupt:
+        log("\nInterrupted, ending stage")
+        ended = 'interrupted'
+
+    stop.set()
+    # Workers are daemons; after an interrupt or crash don't wait out slow requests
+    deadline = time.time() + (timeout + 1 if ended == 'completed' else 1)
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.time()))
+    elapsed = time.time() - started
+
+    return {
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'ended': ended,
+        'endpoints': {name: s.summary(elapsed) for name, s in stats.endpoints.items()},
+        'intervals': intervals
+    }
+
+
+def _fmt(value):
+    return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+
+def run(args):
+    log = lambda message: print(message, flush=True)
+
+    weights = parse_mix(args.mix)
+    stubs = None
+    stub_urls = {}
+    service = None
+
+    if args.target:
+        base_url = args.target.rstrip('/')
+        memory = MemorySampler(pid=args.server_pid)
+        if not args.server_pid:
+            log("Note: pass --server-pid to sample the service's RSS")
+    else:
+        if not args.no_stubs:
+            stubs = ChildProcess(_serve_stubs, args.latency_ms, args.jitter_ms,
+                                 args.error_rate, args.timeout_rate)
+            stub_urls = stubs.start()
+
+            # Inherited by the spawned service; DataIntegrator reads them at import
+            os.environ['WEATHER_API_URL'] = stub_urls['weather']
+            os.environ['AURA_TEST_SENTINEL_STUB_URL'] = stub_urls['sentinel']
+            os.environ['WEATHER_API_KEY'] = 'loadtest-key'
+            os.environ['SENTINEL_API_KEY'] = 'loadtest-key'
+
+        if args.tracemalloc:
+            # Trace from interpreter start so import-time allocations are included
+            os.environ['PYTHONTRACEMALLOC'] = str(args.tracemalloc_frames)
+
+        service = ChildProcess(_serve_app, args.verbose)
+        base_url = service.start()
+        os.environ.pop('PYTHONTRACEMALLOC', None)
+        memory = MemorySampler(pid=service.pid, service=service)
+
+    memory.mark_baseline()
+    log(f"Target: {base_url}  mix: {weights}")
+    for name, url in stub_urls.items():
+        log(f"Stub {name}: {url} (latency {args.latency_ms:.0f}±{args.jitter_ms:.0f}ms, "
+            f"errors {args.error_rate:.0%}, timeouts {args.timeout_rate:.0%})")
+
+    harness_started = time.time()
+    stages = []
+    try:
+        for index, concurrency in enumerate(int(c) for c in args.concurrency.split(',')):
+            stage = run_stage(
+                base_url, concurrency, args.duration, args.interval, weights, memory,
+                args.timeout, log, warmup=args.warmup if index == 0 else 0.0
+            )
+            stages.append(stage)
+            if stage['ended'] != 'completed':
+                break
+    except KeyboardInterrupt:
+        log("\nInterrupted, summarising recorded stages")
+
+    try:
+        memory_growth = memory.growth()
+    finally:
+        if service is not None:
+            service.stop()
+        upstreams = (stubs.stop() if stubs is not None else None) or {}
+
+    report = {
+        'target': base_url,
+        'mix': weights,
+        'stages': stages,
+        'memory': memory_growth,
+        'upstreams': upstreams
+    }
+    if service is not None and service.exited_at is not None:
+        report['service_exit'] = {
+            'elapsed_s': round(service.exited_at - harness_started, 1),
+            'exitcode': service.process.exitcode
+        }
+
+    log("\n=== Summary ===")
+    if 'service_exit' in report:
+        exit_info = report['service_exit']
+        log(f"Service exited at t={exit_info['elapsed_s']:.0f}s (exit code {exit_info['exitcode']})")
+    for stage in stages:
+        log(f"\nConcurrency {stage['concurrency']} ({stage['ended']}):")
+        for name, s in stage['endpoints'].items():
+            log(f"  {name:<10} {s['requests']:>7} req  {s['throughput_rps']:>7.1f} rps  "
+                f"p50 {_fmt(s['p50_ms'])}  p95 {_fmt(s['p95_ms'])}  p99 {_fmt(s['p99_ms'])} ms  "
+                f"err {s['error_rate'] * 100:.1f}%  fallback {s['fallback_rate'] * 100:.1f}%")
+
+    growth = report['memory']
+    log("\nMemory (since warmup):")
+    if 'rss_growth_mb' in growth:
+        log(f"  RSS: {growth['baseline']['rss_mb']:.1f} -> {growth['final']['rss_mb']:.1f} MB "
+            f"({growth['rss_growth_mb']:+.1f} MB)")
+    if 'traced_growth_mb' in growth:
+        log(f"  tracemalloc: {growth['baseline']['traced_mb']:.1f} -> {growth['final']['traced_mb']:.1f} MB "
+            f"({growth['traced_growth_mb']:+.1f} MB)")
+    for alloc in growth.get('top_allocations', [])[:5]:
+        log(f"    {alloc['size_diff_kb']:+.1f} KB  {alloc['location']}")
+
+    for name, counts in report['upstreams'].items():
+        log(f"Upstream {name}: {counts['requests']} requests, {counts['errors']} injected errors, "
+            f"{counts['timeouts']} injected timeouts")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+        log(f"\nReport written to {args.report}")
+
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load and soak test the AURA ML API with local upstream stubs"
+    )
+    parser.add_argument('--target', default=None,
+                        help="Base URL of a running service (default: spawn app.py's Flask app)")
+    parser.add_argument('--server-pid', type=int, default=None,
+                        help="PID of the --target service, for RSS sampling")
+    parser.add_argument('--concurrency', default='8',
+                        help="Concurrent clients; comma-separated values run as successive "
+                             "stages to find saturation (default: 8)")
+    parser.add_argument('--duration', type=float, default=60.0,
+                        help="Seconds per stage; use hours for soaks (default: 60)")
+    parser.add_argument('--warmup', type=float, default=5.0,
+                        help="Seconds of unrecorded traffic before the first stage (default: 5)")
+    parser.add_argument('--interval', type=float, default=10.0,
+                        help="Seconds between progress lines (default: 10)")
+    parser.add_argument('--mix', default=DEFAULT_MIX,
+                        help=f"Endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--timeout', type=float, default=30.0,
+                        help="Client request timeout in seconds (default: 30)")
+    parser.add_argument('--report', default=None, help="Write a JSON report to this path")
+
+    stubs = parser.add_argument_group('upstream stubs (spawned service only)')
+    stubs.add_argument('--no-stubs', action='store_true',
+                       help="Do not start stubs; the service uses its own configuration")
+    stubs.add_argument('--latency-ms', type=float, default=150.0)
+    stubs.add_argument('--jitter-ms', type=float, default=50.0)
+    stubs.add_argument('--error-rate', type=float, default=0.02,
+                       help="Fraction of upstream calls answered with HTTP 503 (default: 0.02)")
+    stubs.add_argument('--timeout-rate', type=float, default=0.0,
+                       help="Fraction of upstream calls stalled past the client timeout")
+
+    memory = parser.add_argument_group('memory tracking (spawned service only)')
+    memory.add_argument('--tracemalloc', action='store_true',
+                        help="Track the service's Python heap growth via PYTHONTRACEMALLOC "
+                             "(slows the service)")
+    memory.add_argument('--tracemalloc-frames', type=int, default=1)
+
+    parser.add_argument('--verbose', action='store_true',
+                        help="Show per-request service logs (fetch failures always show)")
+    return parser.parse_args(argv)
+
+
+if __name__ == '__main__':
+    run(parse_args())
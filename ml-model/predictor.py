@@ -12,6 +12,52 @@ from datetime import datetime, timedelta
 import joblib
 import os
 
+# Hours of history fed to the LSTM per prediction
+SEQUENCE_LENGTH = 48
+
+# Storage defaults applied when a request omits a field
+DEFAULT_STORAGE = {
+    'storage_type': 'bag',
+    'storage_quality': 0.5,
+    'moisture_content': 12.0
+}
+
+# Recommendation templates keyed by risk level; the key doubles as the
+# template id so bulk exports and clients can reference the list by id
+RECOMMENDATION_TEMPLATES = {
+    'CRITICAL': (
+        "🚨 IMMEDIATE ACTION REQUIRED",
+        "Deploy moisture-absorbing desiccants (silica gel/calcium chloride) in storage area",
+        "Ensure maximum ventilation - open all vents and use fans if available",
+        "Move produce to cooler, drier storage immediately if possible",
+        "Reduce storage density to improve air circulation",
+        "Consider emergency drying using mechanical dryers",
+        "Test samples for aflatoxin contamination within 24 hours"
+    ),
+    'HIGH': (
+        "⚠️ HIGH RISK - Take preventive action within 24 hours",
+        "Increase ventilation in storage area",
+        "Deploy drying beads or moisture control agents",
+        "Monitor temperature and humidity every 6 hours",
+        "Inspect produce for visible mold or discoloration",
+        "Prepare for possible relocation to better storage"
+    ),
+    'MODERATE': (
+        "⚡ MODERATE RISK - Monitor closely and prepare",
+        "Check storage ventilation systems are functioning",
+        "Keep drying materials ready for deployment",
+        "Monitor weather forecasts for humidity spikes",
+        "Inspect storage area for moisture accumulation",
+        "Plan for increased monitoring over next 48 hours"
+    ),
+    'LOW': (
+        "✅ LOW RISK - Maintain current practices",
+        "Continue routine monitoring",
+        "Keep storage area clean and well-ventilated",
+        "Monitor for changes in weather conditions"
+    )
+}
+
 class AuraPredictor:
     """
     Main prediction engine for aflatoxin contamination risk
@@ -27,6 +73,16 @@ class AuraPredictor:
         self.CRITICAL_THRESHOLD = 8.0
         self.HIGH_THRESHOLD = 6.0
         self.MODERATE_THRESHOLD = 4.0
+    
+    @classmethod
+    def from_env(cls):
+        """Create a predictor, loading the trained model at MODEL_PATH if present"""
+        predictor = cls()
+        model_path = os.getenv('MODEL_PATH')
+        if model_path and os.path.exists(model_path):
+            predictor.model_path = model_path
+            predictor.load_model(model_path)
+        return predictor
         
     def build_model(self, sequence_length=48, feature_count=15):
         """
@@ -119,6 +175,47 @@ class AuraPredictor:
         
         return np.array(features)
     
+    def build_sequence(self, satellite_data, weather_current, storage_data):
+        """
+        Build the model input sequence for one location
+        
+        Every timestep currently uses the same inputs, so features are
+        preprocessed once and repeated SEQUENCE_LENGTH times
+        """
+        features = self.preprocess_data(satellite_data, weather_current, storage_data)
+        return np.tile(features, (SEQUENCE_LENGTH, 1))
+    
+    @staticmethod
+    def storage_data_from(params):
+        """Map request-style storage fields onto preprocess_data's storage dict"""
+        values = {
+            key: default if params.get(key) is None else params[key]
+            for key, default in DEFAULT_STORAGE.items()
+        }
+        return {
+            'type': values['storage_type'],
+            'ventilation_score': float(values['storage_quality']),
+            'moisture_content': float(values['moisture_content'])
+        }
+    
+    def assess_batch(self, inputs):
+        """
+        Score several locations with a single model call
+        
+        Args:
+            inputs: List of (satellite_data, weather_current, storage_data)
+            
+        Returns:
+            List of (risk_result, recommendations) in input order
+        """
+        sequences = [self.build_sequence(*item) for item in inputs]
+        results = self.predict_risk_batch(sequences)
+        return [(result, self.generate_recommendations(result)) for result in results]
+    
+    def assess(self, satellite_data, weather_current, storage_data):
+        """Score one location; see assess_batch"""
+        return self.assess_batch([(satellite_data, weather_current, storage_data)])[0]
+    
     def predict_risk(self, data_sequence):
         """
         Generate Aflatoxin Risk Score (ARS) from data sequence
@@ -129,28 +226,44 @@ class AuraPredictor:
         Returns:
             Risk score (1-10) and risk level classification
         """
+        return self.predict_risk_batch([data_sequence])[0]
+    
+    def predict_risk_batch(self, data_sequences):
+        """
+        Generate risk scores for several sequences in one model call
+        
+        Args:
+            data_sequences: List of time-series arrays of preprocessed features
+            
+        Returns:
+            List of risk results, one per sequence
+        """
         if self.model is None:
             # Use synthetic model for demo (replace with trained model)
-            return self._synthetic_prediction(data_sequence)
+            return [self._synthetic_prediction(sequence) for sequence in data_sequences]
         
-        # Reshape for LSTM input: (batch_size, timesteps, features)
-        input_data = np.expand_dims(data_sequence, axis=0)
+        if not data_sequences:
+            return []
         
-        # Get prediction
-        raw_score = self.model.predict(input_data, verbose=0)[0][0]
+        # Stack into LSTM input: (batch_size, timesteps, features)
+        input_data = np.stack(data_sequences)
         
-        # Clip to 1-10 range
-        risk_score = np.clip(raw_score, 1.0, 10.0)
+        # Get predictions
+        raw_scores = self.model.predict(input_data, verbose=0)[:, 0]
         
-        # Classify risk level
-        risk_level = self._classify_risk(risk_score)
+        # Clip to 1-10 range
+        risk_scores = np.clip(raw_scores, 1.0, 10.0)
         
-        return {
-            'risk_score': float(risk_score),
-            'risk_level': risk_level,
-            'timestamp': datetime.now().isoformat(),
-            'confidence': 0.85  # Model confidence score
-        }
+        timestamp = datetime.now().isoformat()
+        return [
+            {
+                'risk_score': float(risk_score),
+                'risk_level': self._classify_risk(risk_score),
+                'timestamp': timestamp,
+                'confidence': 0.85  # Model confidence score
+            }
+            for risk_score in risk_scores
+        ]
     
     def _synthetic_prediction(self, data_sequence):
         """
@@ -221,48 +334,14 @@ class AuraPredictor:
         risk_level = risk_data['risk_level']
         score = risk_data['risk_score']
         
-        recommendations = []
-        
-        if risk_level == 'CRITICAL':
-            recommendations = [
-                "🚨 IMMEDIATE ACTION REQUIRED",
-                "Deploy moisture-absorbing desiccants (silica gel/calcium chloride) in storage area",
-                "Ensure maximum ventilation - open all vents and use fans if available",
-                "Move produce to cooler, drier storage immediately if possible",
-                "Reduce storage density to improve air circulation",
-                "Consider emergency drying using mechanical dryers",
-                "Test samples for aflatoxin contamination within 24 hours"
-            ]
-        elif risk_level == 'HIGH':
-            recommendations = [
-                "⚠️ HIGH RISK - Take preventive action within 24 hours",
-                "Increase ventilation in storage area",
-                "Deploy drying beads or moisture control agents",
-                "Monitor temperature and humidity every 6 hours",
-                "Inspect produce for visible mold or discoloration",
-                "Prepare for possible relocation to better storage"
-            ]
-        elif risk_level == 'MODERATE':
-            recommendations = [
-                "⚡ MODERATE RISK - Monitor closely and prepare",
-                "Check storage ventilation systems are functioning",
-                "Keep drying materials ready for deployment",
-                "Monitor weather forecasts for humidity spikes",
-                "Inspect storage area for moisture accumulation",
-                "Plan for increased monitoring over next 48 hours"
-            ]
-        else:
-            recommendations = [
-                "✅ LOW RISK - Maintain current practices",
-                "Continue routine monitoring",
-                "Keep storage area clean and well-ventilated",
-                "Monitor for changes in weather conditions"
-            ]
+        template_id = risk_level if risk_level in RECOMMENDATION_TEMPLATES else 'LOW'
+        recommendations = list(RECOMMENDATION_TEMPLATES[template_id])
         
         return {
             'risk_level': risk_level,
             'risk_score': score,
             'actions': recommendations,
+            'template_id': template_id,
             'priority': 'URGENT' if score >= 8 else 'HIGH' if score >= 6 else 'NORMAL'
         }
     
@@ -308,29 +387,18 @@ if __name__ == "__main__":
         'moisture_content': 14.0
     }
     
-    # Create time series (48 hours of data)
-    sequence = []
-    for i in range(48):
-        features = predictor.preprocess_data(
-            sample_satellite, 
-            sample_weather, 
-            sample_storage
-        )
-        sequence.append(features)
-    
-    sequence = np.array(sequence)
-    
-    # Get prediction
-    risk_data = predictor.predict_risk(sequence)
+    # Score a 48-hour sequence built from the sample inputs
+    risk_data, recommendations = predictor.assess(
+        sample_satellite,
+        sample_weather,
+        sample_storage
+    )
     
     print(f"\nRisk Assessment:")
     print(f"  Score: {risk_data['risk_score']:.1f}/10")
     print(f"  Level: {risk_data['risk_level']}")
     print(f"  Confidence: {risk_data['confidence']*100:.0f}%")
     
-    # Get recommendations
-    recommendations = predictor.generate_recommendations(risk_data)
-    
     print(f"\nRecommendations ({recommendations['priority']} priority):")
     for action in recommendations['actions']:
         print(f"  • {action}")
@@ -0,0 +1,169 @@
+"""
+Response Encoding Module
+Field selection, compact recommendations and content negotiation
+(JSON / MessagePack, optional gzip) for ML API responses
+"""
+
+import gzip
+import json
+import math
+
+from flask import Response
+
+# Optional fast encoders; fall back to the standard library when missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Bodies smaller than this are not worth the gzip CPU
+GZIP_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+
+
+def parse_fields(fields_param):
+    """
+    Parse a ?fields= query value into a nested selection tree
+
+    Example:
+        "prediction,recommendations.priority" ->
+        {'prediction': None, 'recommendations': {'priority': None}}
+
+    None marks a fully selected subtree.
+    """
+    if not fields_param:
+        return None
+
+    tree = {}
+    for path in fields_param.split(','):
+        parts = [part.strip() for part in path.split('.') if part.strip()]
+        if not parts:
+            continue
+
+        node = tree
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                # Parent already fully selected
+                break
+            node[part] = child
+            node = child
+        else:
+            node[parts[-1]] = None
+
+    return tree or None
+
+
+def select_fields(payload, selection):
+    """
+    Keep only the selected fields of a payload
+
+    Lists are filtered element-wise, so "forecast.humidity" keeps just the
+    humidity of every forecast entry. Unknown fields are ignored.
+    """
+    if selection is None:
+        return payload
+
+    if isinstance(payload, list):
+        return [select_fields(item, selection) for item in payload]
+
+    if not isinstance(payload, dict):
+        return payload
+
+    return {
+        key: select_fields(payload[key], subtree)
+        for key, subtree in selection.items()
+        if key in payload
+    }
+
+
+def compact_recommendations(payload):
+    """
+    Replace recommendation action text with its template id
+
+    Clients resolve ids via GET /api/recommendations/templates instead of
+    receiving the same strings on every prediction.
+    """
+    recommendations = payload.get('recommendations')
+    if isinstance(recommendations, dict) and 'template_id' in recommendations:
+        compact = dict(recommendations)
+        compact.pop('actions', None)
+        payload = dict(payload)
+        payload['recommendations'] = compact
+    return payload
+
+
+def _finite(obj):
+    """Replace NaN/Inf with None, matching orjson's output"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    return obj
+
+
+def _default(obj):
+    """Serialize numpy scalars/arrays and other stragglers"""
+    if hasattr(obj, 'tolist'):
+        return _finite(obj.tolist())
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(payload):
+    """Encode payload as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(_finite(payload), default=_default, ensure_ascii=False,
+                      allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def _accepts_msgpack(req):
+    if msgpack is None:
+        return False
+    best = req.accept_mimetypes.best_match(('application/json',) + MSGPACK_MIMETYPES)
+    return best in MSGPACK_MIMETYPES
+
+
+def encode_response(req, payload, status=200):
+    """
+    Build a Flask response for payload negotiated against the request
+
+    Query parameters:
+        fields: comma-separated (dotted) field paths to return
+        recommendations=id: return recommendation template ids only
+
+    Headers:
+        Accept: application/msgpack for MessagePack (when installed)
+        Accept-Encoding: gzip to compress larger bodies
+    """
+    if req.args.get('recommendations') == 'id':
+        payload = compact_recommendations(payload)
+
+    payload = select_fields(payload, parse_fields(req.args.get('fields')))
+
+    if _accepts_msgpack(req):
+        body = msgpack.packb(payload, default=_default, use_bin_type=True)
+        mimetype = MSGPACK_MIMETYPES[0]
+    else:
+        body = dumps_json(payload)
+        mimetype = 'application/json'
+
+    response = Response(body, status=status, mimetype=mimetype)
+    response.vary.update(('Accept', 'Accept-Encoding'))
+
+    if len(body) >= GZIP_MIN_BYTES and req.accept_encodings['gzip'] > 0:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+
+    return response
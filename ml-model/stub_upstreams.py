@@ -0,0 +1,209 @@
+"""
+Local Upstream Stubs
+Imitates OpenWeatherMap, plus a satellite-indices route for DataIntegrator's
+test-only Sentinel hook, with configurable latency and failures, for load
+and soak testing the ML service offline
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class StubProfile:
+    """Latency and failure behaviour for one stubbed upstream"""
+
+    def __init__(self, latency_ms=100.0, jitter_ms=50.0, error_rate=0.0, timeout_rate=0.0,
+                 timeout_s=6.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate        # Fraction answered with HTTP 503
+        self.timeout_rate = timeout_rate    # Fraction stalled past the client timeout
+        self.timeout_s = timeout_s
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def delay(self):
+        """Sleep for one sampled upstream latency"""
+        latency = max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000.0
+        time.sleep(latency)
+
+    def outcome(self):
+        """Decide how to answer the next request: 'ok', 'error' or 'timeout'"""
+        roll = random.random()
+        with self.lock:
+            self.requests += 1
+            if roll < self.timeout_rate:
+                self.timeouts += 1
+                return 'timeout'
+            if roll < self.timeout_rate + self.error_rate:
+                self.errors += 1
+                return 'error'
+        return 'ok'
+
+    def stats(self):
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'errors': self.errors,
+                'timeouts': self.timeouts
+            }
+
+
+def _weather_current(lat, lon):
+    temp = 24.0 + random.uniform(0, 10)
+    humidity = random.randint(45, 95)
+    return {
+        'coord': {'lat': lat, 'lon': lon},
+        'main': {'temp': temp, 'humidity': humidity, 'pressure': random.randint(1000, 1020)},
+        'wind': {'speed': round(random.uniform(0, 12), 1)},
+        'rain': {'1h': random.choice([0.0, 0.0, 0.0, 1.2])},
+        'dt': int(time.time())
+    }
+
+
+def _weather_forecast(lat, lon):
+    # OpenWeatherMap 5 day / 3 hour forecast has 40 entries
+    now = datetime.now(timezone.utc)
+    items = []
+    for step in range(40):
+        at = now + timedelta(hours=3 * step)
+        items.append({
+            'dt': int(at.timestamp()),
+            'dt_txt': at.strftime('%Y-%m-%d %H:%M:%S'),
+            'main': {'temp': 24.0 + random.uniform(0, 10), 'humidity': random.randint(45, 95)},
+            'rain': {'3h': random.choice([0.0, 0.0, 3.0])}
+        })
+    return {'cnt': len(items), 'list': items, 'city': {'coord': {'lat': lat, 'lon': lon}}}
+
+
+def _sentinel_stats(lat, lon):
+    return {
+        'ndvi': round(random.uniform(0.3, 0.9), 3),
+        'ndmi': round(random.uniform(0.2, 0.7), 3),
+        'crop_health': round(random.uniform(0.5, 0.9), 3),
+        'stress_level': round(random.uniform(0.0, 0.6), 3),
+        'canopy_water': round(random.uniform(0.4, 0.8), 3),
+        'chlorophyll': round(random.uniform(0.5, 0.8), 3),
+        'temperature_surface': round(random.uniform(24.0, 34.0), 1)
+    }
+
+
+class StubServer:
+    """
+    Threaded HTTP server answering a fixed set of GET routes
+
+    Args:
+        routes: Mapping of path -> function(lat, lon) returning a JSON body
+        profile: StubProfile controlling latency and failures
+    """
+
+    def __init__(self, routes, profile, host='127.0.0.1', port=0):
+        self.routes = routes
+        self.profile = profile
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                route = stub.routes.get(parsed.path)
+                if route is None:
+                    self._send(404, {'message': 'not found'})
+                    return
+
+                outcome = stub.profile.outcome()
+                if outcome == 'timeout':
+                    time.sleep(stub.profile.timeout_s)
+                stub.profile.delay()
+                if outcome == 'error':
+                    self._send(503, {'message': 'upstream unavailable'})
+                    return
+
+                query = parse_qs(parsed.query)
+                lat = float(query.get('lat', ['0'])[0])
+                lon = float(query.get('lon', ['0'])[0])
+                self._send(200, route(lat, lon))
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up (e.g. its timeout fired first)
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def weather_stub(profile, host='127.0.0.1', port=0):
+    """OpenWeatherMap-compatible stub (/weather and /forecast)"""
+    return StubServer({'/weather': _weather_current, '/forecast': _weather_forecast},
+                      profile, host, port)
+
+
+def sentinel_stub(profile, host='127.0.0.1', port=0):
+    """Satellite indices stub (/stats) for DataIntegrator's AURA_TEST_SENTINEL_STUB_URL hook"""
+    return StubServer({'/stats': _sentinel_stats}, profile, host, port)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run local OpenWeatherMap and Sentinel stubs")
+    parser.add_argument('--weather-port', type=int, default=5101)
+    parser.add_argument('--sentinel-port', type=int, default=5102)
+    parser.add_argument('--latency-ms', type=float, default=150.0)
+    parser.add_argument('--jitter-ms', type=float, default=50.0)
+    parser.add_argument('--error-rate', type=float, default=0.02)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    def profile():
+        return StubProfile(args.latency_ms, args.jitter_ms, args.error_rate, args.timeout_rate)
+
+    weather = weather_stub(profile(), port=args.weather_port).start()
+    sentinel = sentinel_stub(profile(), port=args.sentinel_port).start()
+
+    print("Upstream stubs running. Point the ML service at them with:")
+    print(f"  WEATHER_API_URL={weather.url}")
+    print(f"  AURA_TEST_SENTINEL_STUB_URL={sentinel.url}")
+    print("  (WEATHER_API_KEY and SENTINEL_API_KEY must be set to any value longer than 5 chars)")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        weather.stop()
+        sentinel.stop()